@@ -6,18 +6,27 @@ It sets the permissions to 755 for /home/fosqa.
 Run this script with sudo.
 """
 
-import subprocess
+import stat
 import sys
 import os
 
 def set_parent_permissions(directory, mode):
     try:
         # Get current permissions
-        current_mode = oct(os.stat(directory).st_mode)[-3:]
-        print(f"Current permissions for {directory}: {current_mode}")
-        
-        # Change permissions to desired mode (e.g., '755')
-        subprocess.check_call(["sudo", "chmod", mode, directory])
+        st = os.stat(directory)
+        current_mode = stat.S_IMODE(st.st_mode)
+        print(f"Current permissions for {directory}: {current_mode:03o}")
+
+        desired_mode = int(mode, 8)
+        if stat.S_ISDIR(st.st_mode):
+            # Like GNU chmod with an octal mode, keep setuid/setgid on directories.
+            desired_mode |= current_mode & (stat.S_ISUID | stat.S_ISGID)
+        if current_mode == desired_mode:
+            print(f"Permissions for {directory} already {mode}")
+            return
+
+        # Change permissions to desired mode (e.g., '755'); the script already runs under sudo
+        os.chmod(directory, desired_mode)
         print(f"Permissions for {directory} set to {mode}")
     except Exception as e:
         print("Error:", e)
@@ -5,38 +5,118 @@ is set to fosqa (both user and group). This is useful if you want to revert from
 directory owned by jenkins:fosqa to fosqa:fosqa.
 
 It will:
-  - Change ownership recursively to fosqa:fosqa
-  - Set permissions recursively to 755
+  - Change ownership to fosqa:fosqa
+  - Set permissions to 755
+
+By default only the target directory itself is updated, which is enough when the
+contents already have the right ownership. Pass --recursive to apply the change to
+the whole tree; both changes are then applied in a single walk, without spawning
+chown/chmod, and entries that already have the right owner and mode are left untouched.
 
 Run this script with sudo.
 
-Usage: sudo python3 set_fosqa_owner.py
+Usage: sudo python3 set_jenkins_user_permission_revert.py [--recursive]
 """
 
-import subprocess
-import sys
+import argparse
+import errno
+import grp
 import os
+import pwd
+import stat
+import sys
 
-def update_ownership(directory, owner_group):
+def fix_entry(name, uid, gid, perm, dir_fd=None):
+    """Apply uid/gid/perm to one entry, returning True if anything had to change."""
+    st = os.stat(name, dir_fd=dir_fd, follow_symlinks=False)
+    need_chown = st.st_uid != uid or st.st_gid != gid
+    current = stat.S_IMODE(st.st_mode)
+    if stat.S_ISDIR(st.st_mode):
+        # Like GNU chmod with an octal mode, keep setuid/setgid on directories.
+        perm |= current & (stat.S_ISUID | stat.S_ISGID)
+    # Like chmod -R, leave symlinks alone (Linux cannot chmod a link).
+    need_chmod = not stat.S_ISLNK(st.st_mode) and current != perm
+    if need_chown or need_chmod:
+        if need_chown:
+            os.chown(name, uid, gid, dir_fd=dir_fd, follow_symlinks=False)
+        if need_chmod:
+            # Never follow a symlink swapped in since the stat above; Python
+            # rejects a no-follow chmod of a link with ValueError/NotImplementedError.
+            try:
+                os.chmod(name, perm, dir_fd=dir_fd, follow_symlinks=False)
+            except (ValueError, NotImplementedError):
+                raise OSError(errno.ELOOP, "Entry was replaced by a symlink, mode not changed", name)
+        return True
+    return False
+
+def update_ownership_and_permissions(directory, owner_group, mode, recursive=False):
     try:
-        subprocess.check_call(["sudo", "chown", "-R", owner_group, directory])
-        print(f"Ownership set to {owner_group} for {directory}")
-    except subprocess.CalledProcessError as e:
-        print("Error updating ownership:", e)
+        user, group = owner_group.split(":")
+        uid = pwd.getpwnam(user).pw_uid
+        gid = grp.getgrnam(group).gr_gid
+        perm = int(mode, 8)
+    except (KeyError, ValueError) as e:
+        print("Error updating ownership/permissions:", e)
         sys.exit(1)
 
-def update_permissions(directory, mode):
+    # Like chmod -R/chown -R, follow the target itself if it is a symlink.
+    target = os.path.realpath(directory)
+    changed = skipped = failed = 0
+
+    def report_error(e, context="Error updating ownership/permissions:"):
+        # Like chown -R/chmod -R, report the bad entry and keep going; entries
+        # removed since their directory was listed are not errors.
+        nonlocal failed
+        if isinstance(e, FileNotFoundError):
+            return
+        print(context, e)
+        failed += 1
+
+    def report_walk_error(e):
+        # fwalk names an unreadable subdirectory relative to its parent only.
+        report_error(e, f"Error walking {directory}:")
+
     try:
-        subprocess.check_call(["sudo", "chmod", "-R", mode, directory])
-        print(f"Permissions set to {mode} for {directory}")
-    except subprocess.CalledProcessError as e:
-        print("Error updating permissions:", e)
+        if fix_entry(target, uid, gid, perm):
+            changed += 1
+        else:
+            skipped += 1
+    except OSError as e:
+        print("Error updating ownership/permissions:", e)
+        failed += 1
+    # Nothing to walk if the target itself could not be updated.
+    if recursive and not failed:
+        try:
+            for root, dirs, files, rootfd in os.fwalk(target, follow_symlinks=False, onerror=report_walk_error):
+                for name in dirs + files:
+                    try:
+                        if fix_entry(name, uid, gid, perm, dir_fd=rootfd):
+                            changed += 1
+                        else:
+                            skipped += 1
+                    except OSError as e:
+                        e.filename = os.path.join(root, name)
+                        report_error(e)
+        except OSError as e:
+            # fwalk raises errors on the top directory itself instead of calling onerror.
+            print(f"Error walking {directory}:", e)
+            failed += 1
+
+    if failed:
+        print(f"{changed} entries updated, {skipped} already correct, {failed} failed")
         sys.exit(1)
+    print(f"Ownership set to {owner_group} for {directory}")
+    print(f"Permissions set to {mode} for {directory}")
+    print(f"{changed} entries updated, {skipped} already correct")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Revert ownership of the Jenkins master directory to fosqa:fosqa.")
+    parser.add_argument("--recursive", action="store_true",
+                        help="also update every file and directory under the target directory")
+    args = parser.parse_args()
+
     target_directory = "/home/fosqa/jenkins-master"
     desired_owner = "fosqa:fosqa"
     desired_mode = "755"
     
-    update_ownership(target_directory, desired_owner)
-    update_permissions(target_directory, desired_mode)
+    update_ownership_and_permissions(target_directory, desired_owner, desired_mode, args.recursive)